@@ -29,6 +29,11 @@ class Optimization:
         # Evaluation results
         self.instances = pd.DataFrame(columns=['Raw Parameters', 'Actual Parameters', 'Accuracy', 'Time'])
 
+        # cache of the generated best model, so callers that fit it once
+        # (e.g. test evaluation) get the same fitted instance back
+        self._best_model = None
+        self._best_model_params = None
+
     @property
     def best_evaluation(self):
         if self.instances.empty:
@@ -38,7 +43,10 @@ class Optimization:
     @property
     def best_model(self):
         best_params = self.best_evaluation['Raw Parameters']
-        return self.model_generator.generate_model(best_params)
+        if self._best_model is None or self._best_model_params != best_params:
+            self._best_model = self.model_generator.generate_model(best_params)
+            self._best_model_params = best_params
+        return self._best_model
 
 
 def sigmoid(x):
@@ -95,7 +103,28 @@ class RacosOptimization(Optimization):
         return self.instances['Accuracy'].std()
 
     def clear(self):
-        return
+        """Reset all fitting state so the optimization can be reused"""
+        self.count = 0
+        self.time_out_count = 0
+        self.instances = pd.DataFrame(columns=['Raw Parameters', 'Actual Parameters', 'Accuracy', 'Time'])
+        self._best_model = None
+        self._best_model_params = None
+
+        self.beta0 = 0
+        self.beta1 = 0
+        self.variance = 0
+        self.e_beta1 = 0
+        self.e_beta0 = 0
+        self.e_variance = 0
+        self.inverse_eval = []
+        self.mu = 0
+
+        self.param_change_info = []
+        self._m_value = 0
+        self._n_value = 0
+        self._e_beta0_item3 = 0
+
+        self.racos.clear()
 
     def run_one_step(self, train_x, train_y):
         start = time.time()
@@ -97,7 +97,7 @@ class ERUCB(ModelSelection):
 
         # do model selection
         while consumption < budget:
-            self._logger.info("Process: {}/{}".format(consumption + 1, budget))
+            self._logger.info("Process: %s/%s", consumption + 1, budget)
             selection_values = [o.selection_value(consumption + 1, self.theta) for o in self.optimizations]
 
             if np.isnan(selection_values).any():
@@ -139,9 +139,9 @@ class ERUCB(ModelSelection):
         count = 1
         total_count = len(self.optimizations) * init_times
         for o in self.optimizations:
-            self._logger.info('Initializing {}'.format(o.name))
+            self._logger.info('Initializing %s', o.name)
             for _ in range(init_times):
-                self._logger.info('Init {}/{}'.format(count, total_count))
+                self._logger.info('Init %s/%s', count, total_count)
                 count += 1
                 o.run_one_step(train_x, train_y)
         return count
@@ -184,7 +184,7 @@ class BanditModelSelection(ModelSelection):
         self._init_each_optimizations(train_x, train_y, beta=self.beta)
 
         for t in range(len(self.optimizations) + 1, budget + 1):
-            self._logger.debug('Process: {} / {}'.format(t, budget))
+            self._logger.debug('Process: %s / %s', t, budget)
             next_model = self._next_selection(t)
             if self.update_func == 'new':
                 next_model.run_one_step(train_x, train_y, beta=self.beta)
@@ -242,7 +242,7 @@ class EpsilonGreedySelection(ModelSelection):
 
     def fit(self, train_x, train_y, epsilon=0.1, budget=200):
         for i in range(1, budget + 1):
-            self._logger.debug('Process: {} / {}'.format(i, budget))
+            self._logger.debug('Process: %s / %s', i, budget)
             point = random.uniform(0, 1)
             if point < epsilon:
                 # do exploration
@@ -263,7 +263,7 @@ class SoftMaxSelection(ModelSelection):
 
     def fit(self, train_x, train_y, temperature=0.1, budget=200):
         for i in range(budget):
-            self._logger.debug('Process: {} / {}'.format(i + 1, budget))
+            self._logger.debug('Process: %s / %s', i + 1, budget)
             model = self._next_selection(temperature)
             model.run_one_step(train_x, train_y)
 
@@ -289,6 +289,6 @@ class SingleArm(ModelSelection):
     def fit(self, train_x, train_y, budget=200):
         model = self.optimizations[0]
         for i in range(budget):
-            self._logger.debug(f'Process: {i + 1}/{budget}')
+            self._logger.debug('Process: %s/%s', i + 1, budget)
             model.run_one_step(train_x, train_y)
         return model.instances
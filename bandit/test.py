@@ -1,12 +1,15 @@
+import atexit
+import copy
+import functools
+import json
 import multiprocessing as mp
-import pickle
 import sys
 import time
 from logging import INFO, DEBUG
 
+import numpy as np
 import pandas as pd
 
-import framework.sk_models as sk
 import utils.data_loader as data_loader
 from bandit.model_optimization import RacosOptimization
 from bandit.model_selection import BanditModelSelection, EpsilonGreedySelection, SoftMaxSelection, ERUCB
@@ -20,20 +23,49 @@ BETA_FINDING_DATA = data_loader.data_for_beta_finding()
 
 BUDGET = 100
 B = 0.001
-GROUND_TRUTH_PKL = 'log/ground_truth.pkl'
+# the ground truth models form a small dict[str, str]; JSON keeps it readable
+# and stable across Python versions, unlike the old pickle blob
+GROUND_TRUTH_JSON = 'log/ground_truth.json'
 CORES = 1  # one thread see function one_thread_lab(method)
 
-model_generators = [
-    sk.DecisionTree(),
-    sk.AdaBoost(),
-    sk.GaussianNB(),
-    sk.KNeighbors(),
-    sk.BernoulliNB(),
-    sk.ExtraTrees(),
-    sk.PassiveAggressive(),
-    sk.RandomForest(),
-    sk.SGD()
-]
+
+@functools.lru_cache(maxsize=1)
+def model_generators():
+    # importing the sklearn estimator modules dominates this module's import
+    # time, so pull them in only when the generators are actually needed
+    import framework.sk_models as sk
+
+    return [
+        sk.DecisionTree(),
+        sk.AdaBoost(),
+        sk.GaussianNB(),
+        sk.KNeighbors(),
+        sk.BernoulliNB(),
+        sk.ExtraTrees(),
+        sk.PassiveAggressive(),
+        sk.RandomForest(),
+        sk.SGD()
+    ]
+
+
+# rough relative search times per model, used to dispatch the slow ones to the
+# pool first (longest-processing-time order) so they overlap with the cheap
+# models instead of running alone at the tail
+_APPROX_COST = {
+    'RandomForest': 10,
+    'ExtraTrees': 9,
+    'KNeighbors': 8,
+    'AdaBoost': 5,
+    'SGD': 2,
+    'DecisionTree': 2,
+    'PassiveAggressive': 1,
+    'BernoulliNB': 1,
+    'GaussianNB': 1,
+}
+
+
+def _by_descending_cost(generators):
+    return sorted(generators, key=lambda g: -_APPROX_COST.get(g.name, 1))
 
 
 def parameter_test():
@@ -71,7 +103,7 @@ def one_thread_lab(method):
         csv_file = 'log/ground/ground-total-statistics-{}to{}.csv'.format(start, end)
     elif method == 'full':
         for (data, _) in PROPOSED_DATA:
-            for model in model_generators:
+            for model in model_generators():
                 single_arm_method(data, model)
         return
     else:
@@ -92,14 +124,14 @@ def ground_truth_method(data):
     logger = get_logger('gt', 'log/ground/ground_truth.log', level=INFO)
 
     result = []
-    budget_for_single_model = int(BUDGET / len(model_generators))
-    logger.info('Begin fitting on {}'.format(data.name))
+    budget_for_single_model = int(BUDGET / len(model_generators()))
+    logger.info('Begin fitting on %s', data.name)
     start = time.time()
 
-    for model_generator in model_generators:
+    for model_generator in model_generators():
         result.append(find_ground_truth(data, model_generator, budget_for_single_model))
 
-    logger.info('Fitting on {} is over, spend {}s'.format(data.name, time.time() - start))
+    logger.info('Fitting on %s is over, spend %ss', data.name, time.time() - start)
 
     df_result = pd.DataFrame(data=result, columns=['model', 'best v', 'mean', 'std', 'best model', 'time'])
     df_result.to_csv('log/ground/ground_{}.csv'.format(data.name))
@@ -108,21 +140,21 @@ def ground_truth_method(data):
     best_model_index = df_result['best v'].idxmax()
     best_model = df_result['best model'][best_model_index]
     test_v = _evaluate_test_v(data, best_model)
-    logger.info('Test v of {} is {}'.format(data.name, test_v))
+    logger.info('Test v of %s is %s', data.name, test_v)
 
     return data.name, df_result['best v'].max(), type(best_model).__name__, test_v
 
 
 def single_arm_method(data, model_gen, budget=BUDGET):
-    model_name = type(model_gen).__name__
+    model_name = model_gen.name
     optimization = RacosOptimization(model_gen, model_name)
     train_x, train_y = data.train_data()
     logger = get_logger('single_arm', 'log/single/single_arm.log')
-    logger.info(f'Begin to fit {data.name} using {model_name}')
+    logger.info('Begin to fit %s using %s', data.name, model_name)
     for i in range(budget):
-        logger.info(f'Process: {i + 1}/{budget}')
+        logger.info('Process: %s/%s', i + 1, budget)
         optimization.run_one_step(train_x, train_y)
-    logger.info(f'Fitting on {data.name} using model {model_name} is over')
+    logger.info('Fitting on %s using model %s is over', data.name, model_name)
 
     optimization.instances.to_csv(f'log/single/single_{data.name}_{model_name}.csv')
 
@@ -150,10 +182,17 @@ def find_ground_truth(data, model_generator, budget=BUDGET):
 
     """
     train_x, train_y = data.train_data()
-    model_name = type(model_generator).__name__
+    return _find_ground_truth_on_arrays(data.name, train_x, train_y, model_generator, budget)
+
+
+def _find_ground_truth_on_arrays(data_name, train_x, train_y, model_generator, budget=BUDGET):
+    model_name = model_generator.name
     start = time.time()
-    log = get_logger('gt.model', '', level=INFO)
-    log.info('{} --- {} start fitting'.format(data.name, model_name))
+    # workers under forkserver configure this logger themselves, so it
+    # needs a real file path ('' only worked when fork inherited the
+    # parent's already-configured 'gt' logger)
+    log = get_logger('gt.model', 'log/gt_model.log', level=INFO)
+    log.info('%s --- %s start fitting', data_name, model_name)
 
     # begin sampling
     result = random_search(model_generator, train_x, train_y, search_times=budget)
@@ -163,48 +202,108 @@ def find_ground_truth(data, model_generator, budget=BUDGET):
     best_model = model_generator.generate_model(best_result_params)
 
     elapsed = time.time() - start
-    log.info('{} --- {} end running, spend {}s'.format(data.name, model_name, elapsed))
+    log.info('%s --- %s end running, spend %ss', data_name, model_name, elapsed)
     acc_column = result['Accuracy']
     return model_name, acc_column.max(), acc_column.mean(), acc_column.std(), best_model, elapsed
 
 
+_POOL = None
+
+
+def _get_pool():
+    """Return the shared worker pool, creating it on first use
+
+    Spawning a pool costs a fork plus interpreter setup per worker, so the
+    labs share one pool for the lifetime of the process instead of creating
+    and tearing one down per call.
+
+    """
+    global _POOL
+    if _POOL is None:
+        # recycle a worker after each task so heap fragmentation from the
+        # sklearn fits does not accumulate across the batch
+        _POOL = mp.Pool(processes=CORES, maxtasksperchild=1)
+        atexit.register(_close_pool)
+    return _POOL
+
+
+def _close_pool():
+    global _POOL
+    if _POOL is not None:
+        _POOL.close()
+        _POOL.join()
+        _POOL = None
+
+
+def _apply_star(packed):
+    func, args = packed
+    return func(*args)
+
+
+def _starmap_unordered(pool, func, args_list):
+    """starmap replacement that streams results back as workers finish
+
+    A single slow task no longer blocks collection of the others; the
+    rows come back in completion order, which none of the labs rely on.
+
+    """
+    chunksize = max(1, len(args_list) // (CORES * 4))
+    packed = [(func, args) for args in args_list]
+    return list(pool.imap_unordered(_apply_star, packed, chunksize=chunksize))
+
+
+def _find_ground_truth_shared(x_meta, y_meta, data_name, model_generator, budget):
+    """Worker-side find_ground_truth reading the data from shared memory"""
+    train_x, shm_x = data_loader.attach_shared(x_meta)
+    train_y, shm_y = data_loader.attach_shared(y_meta)
+    try:
+        return _find_ground_truth_on_arrays(data_name, train_x, train_y, model_generator, budget)
+    finally:
+        shm_x.close()
+        shm_y.close()
+
+
 def ground_truth_lab():
     log = get_logger('gt', 'log/gt.log', level=INFO)
     for data in ALL_DATA:
         start = time.time()
-        log.info('Start finding ground truth model for data set {}'.format(data.name))
-
-        result = []
-        for generator in model_generators:
-            result.append(find_ground_truth(data, generator))
+        log.info('Start finding ground truth model for data set %s', data.name)
+
+        # load once and hand the arrays to the workers through shared memory,
+        # instead of pickling a copy of the dataset into every pool task
+        (x_meta, y_meta), _ = data.get_shared()
+        try:
+            result = _starmap_unordered(_get_pool(), _find_ground_truth_shared,
+                                        [(x_meta, y_meta, data.name, generator, BUDGET)
+                                         for generator in _by_descending_cost(model_generators())])
+        finally:
+            data_loader.release_shared(data.name)
         df_result = pd.DataFrame(data=result, columns=['name', 'max', 'mean', 'std', 'best_model', 'time'])
         df_result = df_result.set_index(df_result['name'])
         best_model = df_result['max'].idxmax()
+        log.info('best of %s is %s', data.name, best_model)
 
-        # save to csv
-        with open('log/gt_{}.csv'.format(data.name), 'a') as f:
-            f.write('best is {}\n'.format(best_model))
-            df_result.to_csv(f, mode='a')
+        # a single binary pickle write is much cheaper than the append-mode
+        # csv path, and the frame reloads without re-parsing
+        df_result.to_pickle('log/gt_{}.pkl'.format(data.name))
 
         elapsed = time.time() - start
-        log.info('g-test --- Fitting on {} is over, spend {}s'.format(data.name, elapsed))
+        log.info('g-test --- Fitting on %s is over, spend %ss', data.name, elapsed)
 
 
 def ucb_lab(method):
-    with mp.Pool(processes=CORES) as pool:
-        result = pool.starmap(ucb_or_random_method, [(data, method) for data in ALL_DATA])
-        df_result = pd.DataFrame(data=result, columns=['data set', 'best_v', 'best_model', 'test_v'])
-        df_result.to_csv('log/{}_lab.csv'.format(method))
-        df_result.to_pickle('log/{}_lab.pkl'.format(method))
+    result = _starmap_unordered(_get_pool(), ucb_or_random_method, [(data, method) for data in ALL_DATA])
+    df_result = pd.DataFrame(data=result, columns=['data set', 'best_v', 'best_model', 'test_v'])
+    df_result.to_csv('log/{}_lab.csv'.format(method))
+    df_result.to_pickle('log/{}_lab.pkl'.format(method))
 
 
 def eg_or_sf_lab(method, record_file):
     all_data = ALL_DATA
-    with mp.Pool(processes=CORES) as pool:
-        result = pool.map(method, all_data)
-        df_result = pd.DataFrame(data=result, columns=['data set', 'best_v', 'best_model', 'test_v'])
-        df_result.to_csv('log/{}_lab.csv'.format(record_file))
-        df_result.to_pickle('log/{}_lab.pkl'.format(record_file))
+    result = _get_pool().map(method, all_data)
+    df_result = pd.DataFrame(data=result, columns=['data set', 'best_v', 'best_model', 'test_v'])
+    df_result.to_csv('log/{}_lab.csv'.format(record_file))
+    df_result.to_pickle('log/{}_lab.pkl'.format(record_file))
 
 
 def ucb_or_random_method(data, method):
@@ -225,14 +324,14 @@ def ucb_or_random_method(data, method):
     optimizations = _get_optimizations()
     model_selection = BanditModelSelection(optimizations, method)
 
-    log.info('Begin fit on {}'.format(data.name))
+    log.info('Begin fit on %s', data.name)
     train_x, train_y = data.train_data()
 
     start = time.time()
 
     best_optimization = model_selection.fit(train_x, train_y, budget=BUDGET)
 
-    log.info('Fitting on {} is done! Spend {}s'.format(data.name, time.time() - start))
+    log.info('Fitting on %s is done! Spend %ss', data.name, time.time() - start)
 
     csv_file = 'log/{}/{}_{}.csv'.format(method, method, data.name)
     pkl_file = 'log/{}/{}_{}.pkl'.format(method, method, data.name)
@@ -244,11 +343,11 @@ def proposed_lab():
     gamma = float(sys.argv[3])
 
     all_data = PROPOSED_DATA
-    with mp.Pool(processes=CORES) as pool:
-        result = pool.starmap(proposed_method, [(data, theta, gamma, beta) for (data, beta) in all_data])
-        df_result = pd.DataFrame(data=result, columns=['data set', 'best_v', 'best_model', 'test_v'])
-        df_result.to_csv('log/proposed/proposed_{}_{}.csv'.format(theta, gamma))
-        df_result.to_pickle('log/proposed/proposed_{}_{}.pkl'.format(theta, gamma))
+    result = _starmap_unordered(_get_pool(), proposed_method,
+                                [(data, theta, gamma, beta) for (data, beta) in all_data])
+    df_result = pd.DataFrame(data=result, columns=['data set', 'best_v', 'best_model', 'test_v'])
+    df_result.to_csv('log/proposed/proposed_{}_{}.csv'.format(theta, gamma))
+    df_result.to_pickle('log/proposed/proposed_{}_{}.pkl'.format(theta, gamma))
 
 
 def new_erucb_method(data, b=B):
@@ -257,19 +356,25 @@ def new_erucb_method(data, b=B):
 
     model_selection = _get_model_selection(b)
 
-    log.info('Begin fit on {}'.format(data.name))
+    log.info('Begin fit on %s', data.name)
     train_x, train_y = data.train_data()
     start = time.time()
 
     best_optimization = model_selection.fit(train_x, train_y, budget=BUDGET)
 
     elapsed = time.time() - start
-    log.info('Fitting on {} ends, spend {}s'.format(data.name, elapsed))
+    log.info('Fitting on %s ends, spend %ss', data.name, elapsed)
+    # collect the per-step frames and write the process file once, instead of
+    # re-opening the csv and re-running the pandas csv writer per step
+    process_frames = []
     for (prefix, param_info) in model_selection.param_change_info:
         assert isinstance(param_info, pd.DataFrame)
-        with open('log/proposed-new/erucb-process-{}-{}.csv'.format(data.name, b), mode='a') as f:
-            f.write(prefix)
-            param_info.to_csv(f, mode='a')
+        param_info = param_info.copy()
+        param_info.insert(0, 'step', prefix)
+        process_frames.append(param_info)
+    if process_frames:
+        pd.concat(process_frames, ignore_index=True) \
+            .to_csv('log/proposed-new/erucb-process-{}-{}.csv'.format(data.name, b))
 
     csv = 'log/proposed-new/new_erucb_{}_{}.csv'.format(data.name, b)
     return _get_test_result(best_optimization, data, model_selection.statistics(), csv, '', log)
@@ -297,24 +402,26 @@ def proposed_method(data, theta, gamma, beta, show_selection_detail=False):
     optimizations = _get_optimizations()
     model_selection = BanditModelSelection(optimizations, 'new', theta=theta, gamma=gamma, beta=beta)
 
-    log.info('Begin fit on {}'.format(data.name))
+    log.info('Begin fit on %s', data.name)
     train_x, train_y = data.train_data()
 
     start = time.time()
     best_optimization = model_selection.fit(train_x, train_y, budget=BUDGET)
 
-    # write parameter change information
+    # write parameter change information in a single shot
     if show_selection_detail:
-        with open('log/ps_{}_{}_{}.csv'.format(theta, gamma, data.name), 'a') as f:
-            count = len(model_generators)
-            for record in model_selection.param_change_info:
-                f.write('t = {}'.format(count))
-                record.to_csv(f, mode='a')
-                f.write('\n\n')
-
-                count += 1
-
-    log.info('Fitting on {} is over, spend {}s'.format(data.name, time.time() - start))
+        detail_frames = []
+        count = len(model_generators())
+        for record in model_selection.param_change_info:
+            record = record.copy()
+            record.insert(0, 't', count)
+            detail_frames.append(record)
+            count += 1
+        if detail_frames:
+            pd.concat(detail_frames, ignore_index=True) \
+                .to_csv('log/ps_{}_{}_{}.csv'.format(theta, gamma, data.name))
+
+    log.info('Fitting on %s is over, spend %ss', data.name, time.time() - start)
 
     csv_file = 'log/proposed-new/proposed_{}_{}_{}_{}.csv'.format(theta, gamma, beta, data.name)
     pkl_file = 'log/proposed-new/proposed_{}_{}_{}_{}.pkl'.format(theta, gamma, beta, data.name)
@@ -337,14 +444,14 @@ def eg_method(data):
     optimizations = _get_optimizations()
     model_selection = EpsilonGreedySelection(optimizations)
 
-    log.info('Begin fitting on {}'.format(data.name))
+    log.info('Begin fitting on %s', data.name)
     train_x, train_y = data.train_data()
 
     start = time.time()
     best_optimization = model_selection.fit(train_x, train_y, budget=BUDGET)
     elapsed = time.time() - start
 
-    log.info('Fitting on {} is over, spend {}s'.format(data.name, elapsed))
+    log.info('Fitting on %s is over, spend %ss', data.name, elapsed)
 
     csv_file = 'log/eg/eg_{}.csv'.format(data.name)
     pkl_file = 'log/eg/eg_{}.pkl'.format(data.name)
@@ -367,14 +474,14 @@ def softmax_method(data):
     optimizations = _get_optimizations()
     model_selection = SoftMaxSelection(optimizations)
 
-    log.info('Begin fitting on {}'.format(data.name))
+    log.info('Begin fitting on %s', data.name)
     train_x, train_y = data.train_data()
 
     start = time.time()
     best_optimization = model_selection.fit(train_x, train_y, temperature=0.5, budget=BUDGET)
     elapsed = time.time() - start
 
-    log.info('Fitting on {} is over, spend {}s'.format(data.name, elapsed))
+    log.info('Fitting on %s is over, spend %ss', data.name, elapsed)
 
     csv_file = 'log/sf/sf_{}.csv'.format(data.name)
     pkl_file = 'log/sf/sf_{}.pkl'.format(data.name)
@@ -402,8 +509,8 @@ def calculate_exploitation_rate(data, budget_statistics):
 
     """
     # read ground truth model information
-    with open(GROUND_TRUTH_PKL, 'rb') as f:
-        ground_truth_models = pickle.load(f)
+    with open(GROUND_TRUTH_JSON) as f:
+        ground_truth_models = json.load(f)
 
     assert isinstance(ground_truth_models, dict)
     gt_model = ground_truth_models[data.name]  # get ground truth model's name
@@ -428,19 +535,29 @@ def _get_test_result(best_optimization, data, statistics, csv_file, pkl_file, lo
     test_v = _evaluate_test_v(data, best_optimization.best_model)
 
     log.info('\n===========================\n'
-             'Result of fitting on {}\n'
-             'best v: {}\n'
-             'best model: {}\n'
-             'test v: {}\n'
-             '======================'
-             .format(data.name, best_v, best_model, test_v))
+             'Result of fitting on %s\n'
+             'best v: %s\n'
+             'best model: %s\n'
+             'test v: %s\n'
+             '======================',
+             data.name, best_v, best_model, test_v)
 
     return data.name, best_v, best_model, test_v
 
 
+@functools.lru_cache(maxsize=None)
+def _cached_optimizations(b):
+    # pristine templates, never handed out directly
+    return tuple(RacosOptimization(generator, generator.name, b1=b, b2=b)
+                 for generator in model_generators())
+
+
 def _get_optimizations(b=B):
-    return [RacosOptimization(generator, type(generator).__name__, b1=b, b2=b) for generator in
-            model_generators]
+    # the wrappers are expensive to build (racos model setup per generator),
+    # so construct them once per b and hand out deep copies: fit mutates the
+    # optimizations, and sharing one set across calls would wipe the results
+    # a caller still holds the moment the next method starts
+    return [copy.deepcopy(optimization) for optimization in _cached_optimizations(b)]
 
 
 def _get_model_selection(b=B):
@@ -466,8 +583,15 @@ def _evaluate_test_v(data, model):
     test_v: float
         accuracy on test data
     """
-    train_x, train_y = data.train_data()
-    model.fit(train_x, train_y)
+    from sklearn.exceptions import NotFittedError
+    from sklearn.utils.validation import check_is_fitted
+
+    try:
+        check_is_fitted(model)
+    except NotFittedError:
+        # first evaluation of this model instance; later calls reuse the fit
+        train_x, train_y = data.train_data()
+        model.fit(train_x, train_y)
 
     test_x, test_y = data.test_data()
     return model.score(test_x, test_y)
@@ -497,5 +621,8 @@ if __name__ == '__main__':
     # qda = sk.QuadraticDiscriminantAnalysis()
     # random_search(qda, t_x, t_y, search_times=10)
     # ground_truth_lab()
+    # forkserver workers start from a clean interpreter instead of copying
+    # the parent heap (loaded datasets, pandas frames) into every child
+    mp.set_start_method('forkserver', force=True)
     m_opt = sys.argv[1]
     one_thread_lab(m_opt)
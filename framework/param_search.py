@@ -24,7 +24,7 @@ signal.signal(signal.SIGALRM, timeout_handler)
 
 def random_search(model_generator, train_x, train_y, search_times=100):
     evaluator = base.ModelEvaluator(model_generator, train_x, train_y)
-    model_name = type(model_generator).__name__
+    model_name = model_generator.name
     raw_parameter_list = []
     actual_parameter_list = []
     accuracy_list = []
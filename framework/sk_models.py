@@ -1,377 +1,513 @@
-import sklearn.discriminant_analysis
-import sklearn.ensemble
-import sklearn.gaussian_process
-import sklearn.linear_model
-import sklearn.naive_bayes
-import sklearn.neighbors
-import sklearn.svm
-import sklearn.tree
+import inspect
+
+import numpy as np
 
 from framework.base import ModelGenerator, HyperParameter
 
+# specialized model builders compiled from each class's HP_SPACE, keyed by
+# generator class; kept at module level (not on instances) so generators
+# stay picklable for the worker pools
+_generated_builders = {}
+
+
+def _compile_builder(cls, hp_space, param_names, ctor_flags):
+    """Generate a straight-line builder function for one generator class
+
+    The generic generate_model loop pays a Python-level call per
+    parameter for range checking and conversion. Since HP_SPACE is fixed
+    per class, the checks and conversions can be inlined once into a
+    specialized function: bounds become literals, categorical choices
+    become direct tuple indexing, and the estimator is constructed with
+    one keyword-argument call.
+    """
+    namespace = {}
+    lines = ['def _build_{}(initializer, param_values):'.format(cls.__name__)]
+    lines.append('    if len(param_values) != {}:'.format(len(hp_space)))
+    lines.append("        raise AssertionError('expected {} parameter values')".format(len(hp_space)))
+
+    kwarg_parts = []
+    setattr_parts = []
+    for i, (param, name, in_ctor) in enumerate(zip(hp_space, param_names, ctor_flags)):
+        if param.is_categorical_type():
+            choices = '_choices{}'.format(i)
+            namespace[choices] = param._param_range
+            lines.append('    c{0} = int(param_values[{0}])'.format(i))
+            lines.append('    if not (0 <= c{} < {}):'.format(i, len(param._param_range)))
+            lines.append("        raise ValueError('Value of parameter {} is not in range')".format(name))
+            value_expr = '{}[c{}]'.format(choices, i)
+        else:
+            lower_bound, upper_bound = param.param_bound
+            convert = 'int' if param.is_int_type() else 'float'
+            lines.append('    if not ({!r} <= param_values[{}] <= {!r}):'.format(lower_bound, i, upper_bound))
+            lines.append("        raise ValueError('Value of parameter {} is not in range')".format(name))
+            value_expr = '{}(param_values[{}])'.format(convert, i)
+
+        if in_ctor:
+            kwarg_parts.append('{}={}'.format(name, value_expr))
+        else:
+            # names the constructor does not expose fall back to setattr;
+            # the hasattr assert stays at generate time (as at baseline) so
+            # a stale name fails the sample, not the generator construction
+            setattr_parts.append("    assert hasattr(model, '{0}'), "
+                                 "'model is {{}}, invalid parameter is {0}'.format(model)".format(name))
+            setattr_parts.append('    model.{} = {}'.format(name, value_expr))
+
+    lines.append('    model = initializer({})'.format(', '.join(kwarg_parts)))
+    lines.extend(setattr_parts)
+    lines.append('    return model')
+
+    exec('\n'.join(lines), namespace)
+    return namespace['_build_{}'.format(cls.__name__)]
+
 
 class SKLearnModelGenerator(ModelGenerator):
+    # The hyperparameter space of a generator never changes, so each
+    # subclass declares it once as a class-level HP_SPACE tuple instead of
+    # rebuilding ~20 HyperParameter objects on every instantiation.
+    HP_SPACE = ()
 
     def __init__(self, hp_space, model_initializer):
         super().__init__(hp_space, model_initializer)
 
-    def generate_model(self, param_values, actual_params=None):
-        model = self._model_initializer()
+        # generate_model is the hot path of every tuning loop, so flatten
+        # the space into parallel tuples once; the per-call loop then only
+        # touches local names instead of HyperParameter attributes
+        self._param_names = tuple(param.name for param in hp_space)
+        self._converters = tuple(param.convert_raw_param for param in hp_space)
+        self._checkers = tuple(param.in_range for param in hp_space)
+
+        # resolve once which names the constructor accepts; passing them as
+        # keyword arguments gives sklearn a single parameter validation
+        # instead of the re-validation that follows post-hoc setattr
+        ctor_params = inspect.signature(model_initializer).parameters
+        accepts_any = any(p.kind is inspect.Parameter.VAR_KEYWORD for p in ctor_params.values())
+        self._ctor_flags = tuple(accepts_any or name in ctor_params for name in self._param_names)
+
+        # per-dimension bounds as arrays, for validating whole candidate
+        # batches in one vectorized pass (param_bound is inclusive on both
+        # sides for every parameter type)
+        bounds = np.array([param.param_bound for param in hp_space], dtype=float)
+        self._lower_bounds = bounds[:, 0]
+        self._upper_bounds = bounds[:, 1]
+        self._categorical_mask = np.array([param.is_categorical_type() for param in hp_space])
+
+    def validate_batch(self, param_values_2d):
+        """Check a batch of raw candidate vectors against the space at once
+
+        Equivalent to running in_range over every value of every
+        candidate, but as two vectorized comparisons over the whole
+        (n_candidates, n_params) matrix instead of Python-level calls.
+
+        :param param_values_2d: raw candidates, shape (n_candidates, n_params)
+        :return: boolean array of shape (n_candidates,), True where every
+            parameter of the candidate is in range
+        """
+        values = np.asarray(param_values_2d, dtype=float)
+        assert values.ndim == 2 and values.shape[1] == len(self._param_names)
+
+        # categorical raw values are truncated indices, mirroring the
+        # int() cast in the scalar in_range path
+        values = np.where(self._categorical_mask, np.trunc(values), values)
+        return ((values >= self._lower_bounds) & (values <= self._upper_bounds)).all(axis=1)
 
+    def generate_model(self, param_values, actual_params=None):
         if actual_params is not None:
+            model = self._model_initializer()
             for (param, value) in actual_params:
                 assert hasattr(model, param), 'model is {}, invalid param is {}'.format(model, param)
                 setattr(model, param, value)
             return model
 
-        assert len(param_values) == len(self.hp_space)
-        # Check and set each parameters for the new model
-        for value, param in zip(param_values, self.hp_space):
-            if not param.in_range(value):
-                raise ValueError('Value of parameter {} is not in range'.format(param.name))
+        builder = _generated_builders.get(type(self))
+        if builder is None:
+            builder = _compile_builder(type(self), self.hp_space, self._param_names, self._ctor_flags)
+            _generated_builders[type(self)] = builder
 
-            assert hasattr(model, param.name), 'model is {}, invalid parameter is {}'.format(model, param.name)
-            setattr(model, param.name, param.convert_raw_param(value))
-
-        return model
+        return builder(self._model_initializer, param_values)
 
 
 class DecisionTree(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.categorical_param('criterion', ('gini', 'entropy')),
+        HyperParameter.int_param('max_depth', (1, 40)),
+        HyperParameter.int_param('min_samples_split', (2, 20)),
+        HyperParameter.int_param('min_samples_leaf', (1, 20)),
+        HyperParameter.categorical_param('max_features', ('sqrt', 'log2', None)),
+        # HyperParameter.int_param('max_leaf_nodes', (2, 100)),
+        # HyperParameter.float_param('min_impurity_decrease', (0., 100.)),
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.categorical_param('criterion', ('gini', 'entropy')),
-            HyperParameter.int_param('max_depth', (1, 40)),
-            HyperParameter.int_param('min_samples_split', (2, 20)),
-            HyperParameter.int_param('min_samples_leaf', (1, 20)),
-            HyperParameter.categorical_param('max_features', ('sqrt', 'log2', None)),
-            # HyperParameter.int_param('max_leaf_nodes', (2, 100)),
-            # HyperParameter.float_param('min_impurity_decrease', (0., 100.)),
-        ]
+        import sklearn.tree
 
         model_initializer = sklearn.tree.DecisionTreeClassifier
-        super().__init__(hp_space, model_initializer)
+        super().__init__(type(self).HP_SPACE, model_initializer)
 
 
 class ExtraTree(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.int_param('n_estimators', (100, 100)),
+        HyperParameter.categorical_param('criterion', ('gini', 'entropy')),
+        HyperParameter.int_param('max_depth', (1, 40)),
+        HyperParameter.int_param('min_samples_split', (2, 20)),
+        HyperParameter.int_param('min_samples_leaf', (1, 20)),
+        HyperParameter.categorical_param('max_features', ('sqrt', 'log2', None)),
+        # HyperParameter.int_param('max_leaf_nodes', (2, 100)),
+        # HyperParameter.float_param('min_impurity_decrease', (0., 100.)),
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.int_param('n_estimators', (100, 100)),
-            HyperParameter.categorical_param('criterion', ('gini', 'entropy')),
-            HyperParameter.int_param('max_depth', (1, 40)),
-            HyperParameter.int_param('min_samples_split', (2, 20)),
-            HyperParameter.int_param('min_samples_leaf', (1, 20)),
-            HyperParameter.categorical_param('max_features', ('sqrt', 'log2', None)),
-            # HyperParameter.int_param('max_leaf_nodes', (2, 100)),
-            # HyperParameter.float_param('min_impurity_decrease', (0., 100.)),
-        ]
+        import sklearn.tree
 
         model_initializer = sklearn.tree.ExtraTreeClassifier
-        super().__init__(hp_space, model_initializer)
+        super().__init__(type(self).HP_SPACE, model_initializer)
 
 
 class SVC(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.float_param('C', (0.03125, 32768)),
+        HyperParameter.categorical_param('kernel', ('poly', 'rbf', 'sigmoid')),
+        HyperParameter.int_param('degree', (2, 5)),
+        HyperParameter.float_param('gamma', (3.0517578125e-05, 8)),
+        HyperParameter.float_param('coef0', (-1, 1.)),
+        # HyperParameter.categorical_param('shrinking', (True, False)),
+        HyperParameter.float_param('tol', (1e-5, 1e-1))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.float_param('C', (0.03125, 32768)),
-            HyperParameter.categorical_param('kernel', ('poly', 'rbf', 'sigmoid')),
-            HyperParameter.int_param('degree', (2, 5)),
-            HyperParameter.float_param('gamma', (3.0517578125e-05, 8)),
-            HyperParameter.float_param('coef0', (-1, 1.)),
-            # HyperParameter.categorical_param('shrinking', (True, False)),
-            HyperParameter.float_param('tol', (1e-5, 1e-1))
-        ]
+        import sklearn.svm
 
         model_initializer = sklearn.svm.SVC
-        super().__init__(hp_space, model_initializer)
+        super().__init__(type(self).HP_SPACE, model_initializer)
 
 
 class NuSVC(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.float_param('nu', (5e-3, 1)),
+        HyperParameter.categorical_param('kernel', ('poly', 'rbf', 'sigmoid')),
+        HyperParameter.int_param('degree', (2, 5)),
+        HyperParameter.float_param('gamma', (3.0517578125e-05, 8)),
+        HyperParameter.float_param('coef0', (-1, 1.)),
+        # HyperParameter.categorical_param('shrinking', (True, False)),
+        HyperParameter.float_param('tol', (1e-5, 1e-1))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.float_param('nu', (5e-3, 1)),
-            HyperParameter.categorical_param('kernel', ('poly', 'rbf', 'sigmoid')),
-            HyperParameter.int_param('degree', (2, 5)),
-            HyperParameter.float_param('gamma', (3.0517578125e-05, 8)),
-            HyperParameter.float_param('coef0', (-1, 1.)),
-            # HyperParameter.categorical_param('shrinking', (True, False)),
-            HyperParameter.float_param('tol', (1e-5, 1e-1))
-        ]
+        import sklearn.svm
 
         model_initializer = sklearn.svm.NuSVC
-        super().__init__(hp_space, model_initializer)
+        super().__init__(type(self).HP_SPACE, model_initializer)
 
 
 class LinearSVC(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.categorical_param('penalty', ('l1', 'l2')),
+        HyperParameter.categorical_param('loss', ('hinge', 'squared_hinge')),
+        HyperParameter.categorical_param('dual', (True, False)),
+        HyperParameter.float_param('tol', (1e-6, 1e-1)),
+        HyperParameter.float_param('C', (0.03125, 327686))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.categorical_param('penalty', ('l1', 'l2')),
-            HyperParameter.categorical_param('loss', ('hinge', 'squared_hinge')),
-            HyperParameter.categorical_param('dual', (True, False)),
-            HyperParameter.float_param('tol', (1e-6, 1e-1)),
-            HyperParameter.float_param('C', (0.03125, 327686))
-        ]
+        import sklearn.svm
 
         initializer = sklearn.svm.LinearSVC
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class KNeighbors(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.int_param('n_neighbors', (1, 100)),
+        HyperParameter.categorical_param('weights', ('uniform', 'distance')),
+        HyperParameter.categorical_param('p', (1, 2))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.int_param('n_neighbors', (1, 100)),
-            HyperParameter.categorical_param('weights', ('uniform', 'distance')),
-            HyperParameter.categorical_param('p', (1, 2))
-        ]
+        import sklearn.neighbors
 
         initializer = sklearn.neighbors.KNeighborsClassifier
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class RadiusNeighbors(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.float_param('radius', (1e-2, 1e3)),
+        HyperParameter.categorical_param('weights', ('uniform', 'distance')),
+        HyperParameter.categorical_param('algorithm', ('ball_tree', 'kd_tree', 'brute')),
+        HyperParameter.int_param('leaf_size', (3, 100)),
+        HyperParameter.int_param('p', (1, 10))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.float_param('radius', (1e-2, 1e3)),
-            HyperParameter.categorical_param('weights', ('uniform', 'distance')),
-            HyperParameter.categorical_param('algorithm', ('ball_tree', 'kd_tree', 'brute')),
-            HyperParameter.int_param('leaf_size', (3, 100)),
-            HyperParameter.int_param('p', (1, 10))
-        ]
+        import sklearn.neighbors
 
         initializer = sklearn.neighbors.RadiusNeighborsClassifier
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class LogisticRegression(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.categorical_param('penalty', ('l1', 'l2')),
+        HyperParameter.categorical_param('dual', (True, False)),
+        HyperParameter.float_param('tol', (1e-6, 1e-1)),
+        HyperParameter.float_param('C', (1e-2, 1e2)),
+        HyperParameter.categorical_param('solver', ('saga', 'liblinear', 'sag', 'lbfgs', 'newton-cg')),
+        HyperParameter.int_param('max_iter', (100, 1000)),
+        HyperParameter.categorical_param('multi_class', ('ovr', 'multinomial'))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.categorical_param('penalty', ('l1', 'l2')),
-            HyperParameter.categorical_param('dual', (True, False)),
-            HyperParameter.float_param('tol', (1e-6, 1e-1)),
-            HyperParameter.float_param('C', (1e-2, 1e2)),
-            HyperParameter.categorical_param('solver', ('saga', 'liblinear', 'sag', 'lbfgs', 'newton-cg')),
-            HyperParameter.int_param('max_iter', (100, 1000)),
-            HyperParameter.categorical_param('multi_class', ('ovr', 'multinomial'))
-        ]
+        import sklearn.linear_model
 
         initializer = sklearn.linear_model.LogisticRegression
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 # class DualLibLinearLogisticRegression(SKLearnModelGenerator):
 #
+#     HP_SPACE = (
+#         HyperParameter.categorical_param('penalty', ('l2',)),
+#         HyperParameter.categorical_param('dual', (True,)),
+#         HyperParameter.float_param('tol', (1e-6, 1e-1)),
+#         HyperParameter.float_param('C', (1e-2, 1e2)),
+#         HyperParameter.categorical_param('solver', ('liblinear',)),
+#         HyperParameter.int_param('max_iter', (100, 1000)),
+#         HyperParameter.categorical_param('multi_class', ('ovr', 'multinomial'))
+#     )
+#
 #     def __init__(self):
-#         hp_space = [
-#             HyperParameter.categorical_param('penalty', ('l2',)),
-#             HyperParameter.categorical_param('dual', (True,)),
-#             HyperParameter.float_param('tol', (1e-6, 1e-1)),
-#             HyperParameter.float_param('C', (1e-2, 1e2)),
-#             HyperParameter.categorical_param('solver', ('liblinear',)),
-#             HyperParameter.int_param('max_iter', (100, 1000)),
-#             HyperParameter.categorical_param('multi_class', ('ovr', 'multinomial'))
-#         ]
+#         import sklearn.linear_model
 #
 #         initializer = sklearn.linear_model.LogisticRegression
-#         super().__init__(hp_space, initializer)
+#         super().__init__(type(self).HP_SPACE, initializer)
 #
 #
 # class L2PenaltyLogisticRegression(SKLearnModelGenerator):
 #
+#     HP_SPACE = (
+#         HyperParameter.float_param('tol', (1e-6, 1e-1)),
+#         HyperParameter.float_param('C', (1e-2, 1e2)),
+#         HyperParameter.categorical_param('solver', ('newton-cg', 'lbfgs', 'sag')),
+#         HyperParameter.int_param('max_iter', (100, 1000)),
+#         HyperParameter.categorical_param('multi_class', ('ovr', 'multinomial'))
+#     )
+#
 #     def __init__(self):
-#         hp_space = [
-#             HyperParameter.float_param('tol', (1e-6, 1e-1)),
-#             HyperParameter.float_param('C', (1e-2, 1e2)),
-#             HyperParameter.categorical_param('solver', ('newton-cg', 'lbfgs', 'sag')),
-#             HyperParameter.int_param('max_iter', (100, 1000)),
-#             HyperParameter.categorical_param('multi_class', ('ovr', 'multinomial'))
-#         ]
+#         import sklearn.linear_model
 #
 #         initializer = sklearn.linear_model.LogisticRegression
-#         super().__init__(hp_space, initializer)
+#         super().__init__(type(self).HP_SPACE, initializer)
 
 
 class SGD(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.categorical_param('loss', ('hinge', 'log', 'modified_huber', 'squared_hinge', 'perceptron')),
+        HyperParameter.categorical_param('penalty', ('l2', 'l1', 'elasticnet')),
+        HyperParameter.float_param('alpha', (1e-9, 1)),
+        HyperParameter.float_param('l1_ratio', (0.0, 1.0)),
+        HyperParameter.int_param('max_iter', (1000, 10000)),
+        HyperParameter.float_param('tol', (1e-5, 1e-1)),
+        HyperParameter.float_param('epsilon', (1e-5, 1e-1)),
+        HyperParameter.categorical_param('learning_rate', ('constant', 'optimal', 'invscaling')),
+        HyperParameter.float_param('eta0', (1e-7, 1e-1)),
+        HyperParameter.float_param('power_t', (1e-5, 1)),
+        HyperParameter.categorical_param('average', (True, False))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.categorical_param('loss', ('hinge', 'log', 'modified_huber', 'squared_hinge', 'perceptron')),
-            HyperParameter.categorical_param('penalty', ('l2', 'l1', 'elasticnet')),
-            HyperParameter.float_param('alpha', (1e-9, 1)),
-            HyperParameter.float_param('l1_ratio', (0.0, 1.0)),
-            HyperParameter.int_param('max_iter', (1000, 10000)),
-            HyperParameter.float_param('tol', (1e-5, 1e-1)),
-            HyperParameter.float_param('epsilon', (1e-5, 1e-1)),
-            HyperParameter.categorical_param('learning_rate', ('constant', 'optimal', 'invscaling')),
-            HyperParameter.float_param('eta0', (1e-7, 1e-1)),
-            HyperParameter.float_param('power_t', (1e-5, 1)),
-            HyperParameter.categorical_param('average', (True, False))
-        ]
+        import sklearn.linear_model
 
         initializer = sklearn.linear_model.SGDClassifier
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class Ridge(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.float_param('alpha', (1e-2, 1e2)),
+        HyperParameter.int_param('max_iter', (1000, 10000)),
+        HyperParameter.float_param('tol', (1e-4, 1e-2)),
+        HyperParameter.categorical_param('solver', ('svd', 'cholesky', 'lsqr', 'sparse_cg', 'sag', 'saga'))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.float_param('alpha', (1e-2, 1e2)),
-            HyperParameter.int_param('max_iter', (1000, 10000)),
-            HyperParameter.float_param('tol', (1e-4, 1e-2)),
-            HyperParameter.categorical_param('solver', ('svd', 'cholesky', 'lsqr', 'sparse_cg', 'sag', 'saga'))
-        ]
+        import sklearn.linear_model
 
         initializer = sklearn.linear_model.RidgeClassifier
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class PassiveAggressive(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.float_param('C', (1e-5, 10)),
+        HyperParameter.categorical_param('fit_intercept', (True,)),
+        HyperParameter.float_param('tol', (1e-5, 1e-1)),
+        HyperParameter.categorical_param('loss', ('hinge', 'squared_hinge')),
+        HyperParameter.categorical_param('average', (False, True))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.float_param('C', (1e-5, 10)),
-            HyperParameter.categorical_param('fit_intercept', (True,)),
-            HyperParameter.float_param('tol', (1e-5, 1e-1)),
-            HyperParameter.categorical_param('loss', ('hinge', 'squared_hinge')),
-            HyperParameter.categorical_param('average', (False, True))
-        ]
+        import sklearn.linear_model
 
         initializer = sklearn.linear_model.PassiveAggressiveClassifier
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class Perceptron(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.categorical_param('penalty', (None, 'l2', 'l1', 'elasticnet')),
+        HyperParameter.float_param('alpha', (1e-5, 1e-3)),
+        HyperParameter.int_param('max_iter', (1000, 10000)),
+        HyperParameter.float_param('tol', (1e-4, 1e-2)),
+        HyperParameter.float_param('eta0', (0.1, 10))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.categorical_param('penalty', (None, 'l2', 'l1', 'elasticnet')),
-            HyperParameter.float_param('alpha', (1e-5, 1e-3)),
-            HyperParameter.int_param('max_iter', (1000, 10000)),
-            HyperParameter.float_param('tol', (1e-4, 1e-2)),
-            HyperParameter.float_param('eta0', (0.1, 10))
-        ]
+        import sklearn.linear_model
 
         initializer = sklearn.linear_model.Perceptron
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class GaussianProcess(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.int_param('max_iter_predict', (10, 1000)),
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.int_param('max_iter_predict', (10, 1000))
-        ]
+        import sklearn.gaussian_process
 
         initializer = sklearn.gaussian_process.GaussianProcessClassifier
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class AdaBoost(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.int_param('n_estimators', (50, 500)),
+        HyperParameter.float_param('learning_rate', (0.1, 2.)),
+        HyperParameter.categorical_param('algorithm', ('SAMME', 'SAMME.R')),
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.int_param('n_estimators', (50, 500)),
-            HyperParameter.float_param('learning_rate', (0.1, 2.)),
-            HyperParameter.categorical_param('algorithm', ('SAMME', 'SAMME.R')),
-        ]
+        import sklearn.ensemble
 
         initializer = sklearn.ensemble.AdaBoostClassifier
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class Bagging(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.int_param('n_estimators', (5, 100)),
+        HyperParameter.float_param('max_samples', (0.0, 1.0)),
+        # HyperParameter.float_param('max_features', (0.0, 1.0))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.int_param('n_estimators', (5, 100)),
-            HyperParameter.float_param('max_samples', (0.0, 1.0)),
-            # HyperParameter.float_param('max_features', (0.0, 1.0))
-        ]
+        import sklearn.ensemble
 
         initializer = sklearn.ensemble.BaggingClassifier
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class ExtraTrees(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.int_param('n_estimators', (100, 100)),
+        HyperParameter.categorical_param('criterion', ('gini', 'entropy')),
+        HyperParameter.int_param('min_samples_split', (2, 20)),
+        HyperParameter.int_param('min_samples_leaf', (1, 20)),
+        HyperParameter.float_param('max_features', (0., 1.)),
+        HyperParameter.categorical_param('bootstrap', (True, False))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.int_param('n_estimators', (100, 100)),
-            HyperParameter.categorical_param('criterion', ('gini', 'entropy')),
-            HyperParameter.int_param('min_samples_split', (2, 20)),
-            HyperParameter.int_param('min_samples_leaf', (1, 20)),
-            HyperParameter.float_param('max_features', (0., 1.)),
-            HyperParameter.categorical_param('bootstrap', (True, False))
-        ]
+        import sklearn.ensemble
 
         initializer = sklearn.ensemble.ExtraTreesClassifier
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class RandomForest(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.categorical_param('n_estimators', (100,)),
+        HyperParameter.categorical_param('criterion', ('gini', 'entropy')),
+        HyperParameter.int_param('min_samples_split', (2, 20)),
+        HyperParameter.int_param('min_samples_leaf', (1, 20)),
+        HyperParameter.float_param('max_features', (0., 1.)),
+        HyperParameter.categorical_param('bootstrap', (True, False)),
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.categorical_param('n_estimators', (100,)),
-            HyperParameter.categorical_param('criterion', ('gini', 'entropy')),
-            HyperParameter.int_param('min_samples_split', (2, 20)),
-            HyperParameter.int_param('min_samples_leaf', (1, 20)),
-            HyperParameter.float_param('max_features', (0., 1.)),
-            HyperParameter.categorical_param('bootstrap', (True, False)),
-        ]
+        import sklearn.ensemble
 
         initializer = sklearn.ensemble.RandomForestClassifier
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class QuadraticDiscriminantAnalysis(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.float_param('reg_param', (0., 1.)),
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.float_param('reg_param', (0., 1.)),
-        ]
+        import sklearn.discriminant_analysis
 
         initializer = sklearn.discriminant_analysis.QuadraticDiscriminantAnalysis
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class GaussianNB(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.float_param('var_smoothing', (1e-10, 1e-8)),
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.float_param('var_smoothing', (1e-10, 1e-8))
-        ]
+        import sklearn.naive_bayes
 
         initializer = sklearn.naive_bayes.GaussianNB
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class BernoulliNB(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.float_param('alpha', (1e-2, 100.0)),
+        HyperParameter.categorical_param('fit_prior', (True, False))
+        # HyperParameter.float_param('binarize', (0.0, 1.0))
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.float_param('alpha', (1e-2, 100.0)),
-            HyperParameter.categorical_param('fit_prior', (True, False))
-            # HyperParameter.float_param('binarize', (0.0, 1.0))
-        ]
+        import sklearn.naive_bayes
 
         initializer = sklearn.naive_bayes.BernoulliNB
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
 
 
 class MultinomialNB(SKLearnModelGenerator):
 
+    HP_SPACE = (
+        HyperParameter.float_param('alpha', (1e-2, 100.0)),
+    )
+
     def __init__(self):
-        hp_space = [
-            HyperParameter.float_param('alpha', (1e-2, 100.0))
-        ]
+        import sklearn.naive_bayes
 
         initializer = sklearn.naive_bayes.MultinomialNB
-        super().__init__(hp_space, initializer)
+        super().__init__(type(self).HP_SPACE, initializer)
@@ -1,4 +1,10 @@
+import atexit
+import concurrent.futures
+import functools
 import pickle
+import weakref
+from multiprocessing import shared_memory
+
 import numpy as np
 import os.path
 
@@ -7,146 +13,377 @@ data_dir = os.path.join(curr_path, '../temp_dataset')
 
 
 def dataset_reader(train_file):
-    f = open(train_file, 'rb')
-    train_features = pickle.load(f)
-    train_labels = pickle.load(f)
-    f.close()
-
-    train_features = np.array(train_features)
-    train_labels = np.array(train_labels)
+    npy_features = _npy_path(train_file, 'features')
+    npy_labels = _npy_path(train_file, 'labels')
+    if os.path.exists(npy_features) and os.path.exists(npy_labels):
+        # memory-mapped load: a header parse plus page mapping, with no
+        # per-element unpickling, and the pages are shared across processes
+        return np.load(npy_features, mmap_mode='r'), np.load(npy_labels, mmap_mode='r')
+
+    return _pickle_dataset_reader(train_file)
+
+
+def _pickle_dataset_reader(train_file):
+    """Read a legacy pickle dataset (two pickled lists of rows)"""
+    # a 1 MiB buffer turns the MB-scale pickles into a handful of read
+    # syscalls instead of the default 8 KiB chunks, and one Unpickler
+    # reads both objects from the same stream
+    with open(train_file, 'rb', buffering=1024 * 1024) as f:
+        unpickler = pickle.Unpickler(f)
+        train_features = unpickler.load()
+        train_labels = unpickler.load()
+
+    # asarray is a no-op for pickles that already hold ndarrays; only the
+    # legacy list-of-rows files pay the conversion
+    train_features = np.asarray(train_features)
+    train_labels = np.asarray(train_labels)
 
     return train_features, train_labels
 
 
-def all_data(include=None, exclude=None):
+def _npy_path(pkl_file, part):
+    base = pkl_file[:-len('.pkl')] if pkl_file.endswith('.pkl') else pkl_file
+    return '{}.{}.npy'.format(base, part)
+
+
+def migrate_to_npy():
+    """One-time conversion of the legacy pickle datasets to .npy files
+
+    The pickles store plain lists of rows, so every load boxes each cell
+    into a Python object before np.array repacks it. Writing the arrays
+    as .npy next to the pickles lets dataset_reader memory-map them
+    instead; already converted datasets are skipped.
+    """
+    for name, path in _index_files().items():
+        if not name.endswith('_data.pkl'):
+            continue
+        npy_features = _npy_path(path, 'features')
+        npy_labels = _npy_path(path, 'labels')
+        if os.path.exists(npy_features) and os.path.exists(npy_labels):
+            continue
+        features, labels = _pickle_dataset_reader(path)
+        np.save(npy_features, features)
+        np.save(npy_labels, labels)
+
+
+def all_data(include=None, exclude=None, prefetch=False):
+    # DataSet only records the name; filtered-out sets (e.g. adult) are never
+    # read from disk. Frozensets keep the per-file membership tests O(1).
+    if include is not None:
+        include = frozenset(include)
+    if exclude is not None:
+        exclude = frozenset(exclude)
+
     data = []
-    for root, dirs, files in os.walk(data_dir):
-        for file in files:
-            if 'train_data.pkl' in file:
-                data_name = file[:file.find('_train_data.pkl')]
-                if include is not None:
-                    if data_name in include:
-                        data.append(DataSet(data_name))
-                elif exclude is not None:
-                    if data_name not in exclude:
-                        data.append(DataSet(data_name))
-                else:
-                    data.append(DataSet(data_name))
+    for file in _index_files():
+        if file.endswith('_train_data.pkl'):
+            data_name = file.removesuffix('_train_data.pkl')
+            if include is not None:
+                if data_name in include:
+                    data.append(DataSet.get(data_name))
+            elif exclude is not None:
+                if data_name not in exclude:
+                    data.append(DataSet.get(data_name))
+            else:
+                data.append(DataSet.get(data_name))
+
+    if prefetch:
+        _prefetch([data_set.name for data_set in data])
 
     return data
 
 
+def _prefetch(names):
+    """Warm the _read_data cache for the given datasets in parallel
+
+    The pickle loads block on file reads that release the GIL, so a small
+    thread pool overlaps them instead of paying each load serially on
+    first use. Failures are left for the lazy path to report when the
+    dataset is actually used.
+    """
+    files = []
+    for name in names:
+        files.append('{}_train_data.pkl'.format(name))
+        files.append('{}_test_data.pkl'.format(name))
+
+    workers = min(8, os.cpu_count() or 1)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(_read_data, file) for file in files]:
+            future.exception()
+
+
 def data_for_proposed_method():
     return [
-        (DataSet('balanceScale'), 0.366),
-        (DataSet('ecoli'), 0.41200000000000003),
-        (DataSet('cylinder'), 0.492),
-        (DataSet('glass'), 0.432),
-        (DataSet('messidor'), 0.45499999999999996),
-        (DataSet('car'), 0.584),
-        (DataSet('chess'), 0.536),
-        (DataSet('wilt'), 0.7949999999999999),
-        (DataSet('nursery'), 0.44099999999999995),
-        (DataSet('spambase'), 0.6900000000000001),
-        (DataSet('statlogSegment'), 0.6599999999999999),
-        (DataSet('wdbc'), 0.604)
+        (DataSet.get('balanceScale'), 0.366),
+        (DataSet.get('ecoli'), 0.41200000000000003),
+        (DataSet.get('cylinder'), 0.492),
+        (DataSet.get('glass'), 0.432),
+        (DataSet.get('messidor'), 0.45499999999999996),
+        (DataSet.get('car'), 0.584),
+        (DataSet.get('chess'), 0.536),
+        (DataSet.get('wilt'), 0.7949999999999999),
+        (DataSet.get('nursery'), 0.44099999999999995),
+        (DataSet.get('spambase'), 0.6900000000000001),
+        (DataSet.get('statlogSegment'), 0.6599999999999999),
+        (DataSet.get('wdbc'), 0.604)
     ]
 
 
 def data_for_beta_finding():
     return [
-        (DataSet('balanceScale'), _get_betas(0.35, 0.75)),
-        (DataSet('car'), _get_betas(0.5, 0.7)),
-        (DataSet('chess'), _get_betas(0.5, 0.7)),
-        (DataSet('cylinder'), _get_betas(0.4, 0.6)),
-        (DataSet('ecoli'), _get_betas(0.4, 0.6)),
-        (DataSet('glass'), _get_betas(0.4, 0.6)),
-        (DataSet('messidor'), _get_betas(0.4, 0.6)),
-        (DataSet('nursery'), _get_betas(0.5, 0.7)),
-        (DataSet('spambase'), _get_betas(0.65, 0.85)),
-        (DataSet('statlogSegment'), _get_betas(0.5, 0.7)),
-        (DataSet('wdbc'), _get_betas(0.6, 0.8)),
-        (DataSet('wilt'), _get_betas(0.7, 0.9))
+        (DataSet.get('balanceScale'), _get_betas(0.35, 0.75)),
+        (DataSet.get('car'), _get_betas(0.5, 0.7)),
+        (DataSet.get('chess'), _get_betas(0.5, 0.7)),
+        (DataSet.get('cylinder'), _get_betas(0.4, 0.6)),
+        (DataSet.get('ecoli'), _get_betas(0.4, 0.6)),
+        (DataSet.get('glass'), _get_betas(0.4, 0.6)),
+        (DataSet.get('messidor'), _get_betas(0.4, 0.6)),
+        (DataSet.get('nursery'), _get_betas(0.5, 0.7)),
+        (DataSet.get('spambase'), _get_betas(0.65, 0.85)),
+        (DataSet.get('statlogSegment'), _get_betas(0.5, 0.7)),
+        (DataSet.get('wdbc'), _get_betas(0.6, 0.8)),
+        (DataSet.get('wilt'), _get_betas(0.7, 0.9))
     ]
 
 
 def data_for_auto_sklearn():
     return [
-        (DataSet('balanceScale'), 37),
-        (DataSet('car'), 2611),
-        (DataSet('chess'), 1986),
-        (DataSet('cylinder'), 2159),
-        (DataSet('ecoli'), 1676),
-        (DataSet('glass'), 203),
-        (DataSet('iris'), 900),
-        (DataSet('messidor'), 1139),
-        (DataSet('mushroom'), 6183),
-        (DataSet('nursery'), 2947),
-        (DataSet('occupancy'), 7760),
-        (DataSet('spambase'), 11307),
-        (DataSet('statlogSegment'), 11656),
-        (DataSet('wdbc'), 2437),
-        (DataSet('wilt'), 3627)
+        (DataSet.get('balanceScale'), 37),
+        (DataSet.get('car'), 2611),
+        (DataSet.get('chess'), 1986),
+        (DataSet.get('cylinder'), 2159),
+        (DataSet.get('ecoli'), 1676),
+        (DataSet.get('glass'), 203),
+        (DataSet.get('iris'), 900),
+        (DataSet.get('messidor'), 1139),
+        (DataSet.get('mushroom'), 6183),
+        (DataSet.get('nursery'), 2947),
+        (DataSet.get('occupancy'), 7760),
+        (DataSet.get('spambase'), 11307),
+        (DataSet.get('statlogSegment'), 11656),
+        (DataSet.get('wdbc'), 2437),
+        (DataSet.get('wilt'), 3627)
     ]
 
 
 def load_data_sets(names):
-    return [DataSet(name) for name in names]
+    return [DataSet.get(name) for name in names]
+
+
+@functools.lru_cache(maxsize=None)
+def _concat_dataset(name):
+    """Load a dataset and concatenate its train and test halves"""
+    path = _full_npz_path(name)
+    if os.path.exists(path):
+        # precomputed concatenation: one file read, no concat allocation
+        data = np.load(path)
+        features, labels = data['X'], data['y']
+    else:
+        features, labels = _concat_from_parts(name)
+
+    # same rule as _read_data: every caller shares the cached arrays, so
+    # keep them read-only (mutators should .copy())
+    features.setflags(write=False)
+    labels.setflags(write=False)
+    return features, labels
+
+
+def _concat_from_parts(name):
+    x1, y1 = _read_data('{}_train_data.pkl'.format(name))
+    x2, y2 = _read_data('{}_test_data.pkl'.format(name))
+    return np.concatenate([x1, x2]), np.concatenate([y1, y2])
 
 
-def adult_dataset():
-    x1, y1 = dataset_reader(os.path.join(curr_path, "../temp_dataset/adult/adult_train_data.pkl"))
-    x2, y2 = dataset_reader(os.path.join(curr_path, "../temp_dataset/adult/adult_test_data.pkl"))
-    return np.concatenate([x1, x2]), np.concatenate([y1, y2])
+def _full_npz_path(name):
+    return os.path.join(data_dir, name, '{}_full.npz'.format(name))
 
 
-def car_dataset():
-    x1, y1 = dataset_reader(os.path.join(curr_path, "../temp_dataset/car/car_train_data.pkl"))
-    x2, y2 = dataset_reader(os.path.join(curr_path, "../temp_dataset/car/car_test_data.pkl"))
-    return np.concatenate([x1, x2]), np.concatenate([y1, y2])
+def migrate_to_full_npz():
+    """One-time precomputation of the concatenated datasets
+
+    Writes {name}_full.npz with the train+test concatenation next to
+    each dataset, so _concat_dataset loads the combined arrays in a
+    single read instead of paying two loads plus an np.concatenate in
+    every process; already converted datasets are skipped.
+    """
+    for data_set in all_data():
+        path = _full_npz_path(data_set.name)
+        if os.path.exists(path):
+            continue
+        features, labels = _concat_from_parts(data_set.name)
+        np.savez(path, X=features, y=labels)
 
 
-def cmc_dataset():
-    x, y = dataset_reader(os.path.join(curr_path, '../temp_dataset/cmc/cmc_train_data.pkl'))
-    x2, y2 = dataset_reader(os.path.join(curr_path, '../temp_dataset/cmc/cmc_test_data.pkl'))
+adult_dataset = functools.partial(_concat_dataset, 'adult')
+car_dataset = functools.partial(_concat_dataset, 'car')
+cmc_dataset = functools.partial(_concat_dataset, 'cmc')
+banknote_dataset = functools.partial(_concat_dataset, 'banknote')
 
-    return np.concatenate([x, x2]), np.concatenate([y, y2])
 
+_dataset_index = None
 
-def banknote_dataset():
-    x, y = dataset_reader(os.path.join(curr_path, '../temp_dataset/banknote/banknote_train_data.pkl'))
-    x2, y2 = dataset_reader(os.path.join(curr_path, '../temp_dataset/banknote/banknote_test_data.pkl'))
 
-    return np.concatenate([x, x2]), np.concatenate([y, y2])
+def _index_files():
+    """Build a {file name: full path} index of temp_dataset once
+
+    One scandir pass replaces the repeated os.walk traversals that
+    all_data and _find used to run on every call.
+    """
+    global _dataset_index
+    if _dataset_index is None:
+        index = {}
+        stack = [data_dir]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                    else:
+                        index.setdefault(entry.name, entry.path)
+        _dataset_index = index
+    return _dataset_index
 
 
 def _find(name, path):
-    for root, dirs, files in os.walk(path):
-        if name in files:
-            return os.path.join(root, name)
+    # path is kept for signature compatibility; everything this module
+    # looks up lives under the indexed data_dir
+    return _index_files().get(name)
 
 
+@functools.lru_cache(maxsize=None)
 def _read_data(file_name):
-    path = os.path.join(curr_path, '../temp_dataset')
-    return dataset_reader(_find(file_name, path))
+    features, labels = dataset_reader(_find(file_name, data_dir))
+
+    # the cached arrays are shared by every caller; keep them read-only so
+    # one consumer cannot silently corrupt another (mutators should .copy())
+    features.setflags(write=False)
+    labels.setflags(write=False)
+    return features, labels
+
+
+# shared memory blocks owned by this process, keyed by dataset name; the
+# blocks must outlive every worker that attaches to them, so they are kept
+# here and released in one place at exit
+_shared_data = {}
+
+
+def share_array(array):
+    """Copy an array into a shared memory block
+
+    :param array: array to share with worker processes
+    :return: the owning block and a picklable (name, shape, dtype) handle;
+        the caller is responsible for closing and unlinking the block
+    """
+    shm = shared_memory.SharedMemory(create=True, size=array.nbytes)
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+    return shm, (shm.name, array.shape, str(array.dtype))
+
+
+def attach_shared(meta):
+    """Reconstruct an array view on a shared block from its handle
+
+    :param meta: a picklable (name, shape, dtype) handle produced by
+        DataSet.get_shared
+    :return: the zero-copy array view and the attached block; the caller
+        closes the block once it is done with the view
+    """
+    name, shape, dtype = meta
+    shm = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf), shm
+
+
+def release_shared(name=None):
+    """Close and unlink shared blocks owned by this process
+
+    :param name: release only this dataset's blocks; None releases all
+    """
+    if name is not None:
+        _, blocks = _shared_data.pop(name, (None, ()))
+    else:
+        blocks = []
+        while _shared_data:
+            blocks.extend(_shared_data.popitem()[1][1])
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+
+atexit.register(release_shared)
 
 
 def _get_betas(start, end, steps=50):
-    return [start + (end - start) * i / steps for i in range(steps)]
+    # endpoint=False matches the old comprehension, which divided by steps
+    # rather than steps - 1 and so never produced end itself
+    return np.linspace(start, end, steps, endpoint=False)
 
 
 class DataSet:
 
+    __slots__ = ('name', '_train', '_test', '__weakref__')
+
+    _interned = weakref.WeakValueDictionary()
+
     def __init__(self, name):
         self.name = name
+        self._train = None
+        self._test = None
+
+    @classmethod
+    def get(cls, name):
+        """Return the interned DataSet for this name
+
+        All callers asking for the same dataset share one instance, so
+        the per-instance data cache is shared as well.
+        """
+        instance = cls._interned.get(name)
+        if instance is None:
+            instance = cls(name)
+            cls._interned[name] = instance
+        return instance
 
     def __repr__(self):
         return 'DataSet({})'.format(self.name)
 
+    def __eq__(self, other):
+        return isinstance(other, DataSet) and other.name == self.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __reduce__(self):
+        # pickle by name: workers re-intern locally instead of receiving a
+        # copy of the cached arrays
+        return DataSet.get, (self.name,)
+
     def train_data(self):
-        file = '{}_train_data.pkl'.format(self.name)
-        return _read_data(file)
+        if self._train is None:
+            file = '{}_train_data.pkl'.format(self.name)
+            self._train = _read_data(file)
+        return self._train
 
     def test_data(self):
-        file = '{}_test_data.pkl'.format(self.name)
-        return _read_data(file)
+        if self._test is None:
+            file = '{}_test_data.pkl'.format(self.name)
+            self._test = _read_data(file)
+        return self._test
+
+    def get_shared(self):
+        """Copy the train and test arrays into shared memory once
+
+        Worker processes receive only the picklable handles and rebuild
+        zero-copy views with attach_shared, instead of each re-reading
+        and duplicating the dataset. The blocks stay owned by this
+        process until release_shared (registered at exit) unlinks them.
+
+        :return: ((train_x, train_y), (test_x, test_y)) handles, each a
+            (name, shape, dtype) tuple
+        """
+        if self.name not in _shared_data:
+            blocks = []
+            handles = []
+            for array in (*self.train_data(), *self.test_data()):
+                shm, meta = share_array(array)
+                blocks.append(shm)
+                handles.append(meta)
+            _shared_data[self.name] = (((handles[0], handles[1]), (handles[2], handles[3])), blocks)
+        return _shared_data[self.name][0]